@@ -1,3 +1,6 @@
+from ._visitor import TemplateVisitor, extract_classes, extract_classes_from_source, HTPY_TAGS
 from .main import (
-    TemplateVisitor, TemplateHandler, scan_file, scan_directory, generate_template_js, main, should_ignore_path
+    TemplateHandler, scan_file, scan_directory, generate_template_js, main, should_ignore_path,
+    get_cache_dir, prune_cache, scan_files, iter_template_paths,
+    load_gitignore, GitignoreMatcher
 )
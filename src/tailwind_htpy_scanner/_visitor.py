@@ -0,0 +1,171 @@
+"""
+Class extraction from HTPy template source.
+
+Kept free of I/O and strictly typed so it can be compiled with mypyc.
+"""
+
+import ast
+import io
+import keyword
+import re
+import tokenize
+from typing import List, Optional, Set, Tuple
+
+# HTML elements exported by htpy; dot notation is only read from calls to these
+HTPY_TAGS = frozenset({
+    "a", "abbr", "address", "area", "article", "aside", "audio", "b", "base", "bdi", "bdo",
+    "blockquote", "body", "br", "button", "canvas", "caption", "cite", "code", "col", "colgroup",
+    "data", "datalist", "dd", "del_", "details", "dfn", "dialog", "div", "dl", "dt", "em", "embed",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head",
+    "header", "hgroup", "hr", "html", "i", "iframe", "img", "input", "ins", "kbd", "label", "legend",
+    "li", "link", "main", "map", "mark", "math", "menu", "meta", "meter", "nav", "noscript", "object",
+    "ol", "optgroup", "option", "output", "p", "picture", "pre", "progress", "q", "rp", "rt",
+    "ruby", "s", "samp", "script", "search", "section", "select", "slot", "small", "source", "span",
+    "strong", "style", "sub", "summary", "sup", "svg", "table", "tbody", "td", "template",
+    "textarea", "tfoot", "th", "thead", "time", "title", "tr", "track", "u", "ul", "var", "video",
+    "wbr",
+})
+
+# class_ values are split on whitespace only, so fractional values such as p-0.5 survive
+_CLASS_RE = re.compile(r"\S+")
+# htpy splits dot notation on every dot, so div(".flex.items-center") is two classes
+_DOT_CLASS_RE = re.compile(r"[^\s.]+")
+
+# Tokens that can appear anywhere inside brackets without changing the expression
+_IGNORED_TOKENS = frozenset({tokenize.NL, tokenize.COMMENT})
+
+def extract_classes(tree: ast.AST) -> Set[str]:
+    """
+    Extract class names from HTPy template code, looking for class_ attributes and dot notation classes.
+
+    Walks the tree in a flat loop instead of NodeVisitor's per-node method dispatch.
+
+    Args:
+        tree: Parsed module (or any node) to search
+
+    Returns:
+        Set[str]: Set of Tailwind class names found
+    """
+    classes: Set[str] = set()
+
+    for node in ast.walk(tree):
+        if type(node) is not ast.Call:
+            continue
+
+        # Check for class_ keyword arguments
+        for keyword in node.keywords:
+            if keyword.arg == 'class_':
+                value = keyword.value
+                if type(value) is ast.Constant and type(value.value) is str:
+                    classes.update(_CLASS_RE.findall(value.value))
+
+        # Check for dot notation (e.g., div(".class1 .class2"))
+        func = node.func
+        if node.args and type(func) is ast.Name and func.id in HTPY_TAGS:
+            first = node.args[0]
+            if type(first) is ast.Constant and type(first.value) is str and first.value.startswith('.'):
+                classes.update(_DOT_CLASS_RE.findall(first.value))
+
+    return classes
+
+class TemplateVisitor(ast.NodeVisitor):
+    """AST visitor that extracts class names from HTPy template code."""
+    def __init__(self) -> None:
+        self.classes: Set[str] = set()
+
+    def visit(self, node: ast.AST) -> None:
+        """Collect the classes used anywhere under node."""
+        self.classes.update(extract_classes(node))
+
+def _string_argument(tokens: List[Tuple[int, str]], start: int) -> Optional[str]:
+    """
+    Return the value of a string literal argument beginning at tokens[start].
+
+    Adjacent literals are concatenated as Python does, and redundant
+    parentheses around them (as black and ruff add when wrapping long
+    strings) are allowed. Returns None unless the argument is nothing but
+    str literals, i.e. it is followed by ',' or ')'.
+    """
+    index = start
+    # Count the parentheses wrapping the literals, which must all be closed right after them
+    depth = 0
+    while index < len(tokens) and tokens[index] == (tokenize.OP, '('):
+        depth += 1
+        index += 1
+
+    parts = []
+    while index < len(tokens) and tokens[index][0] == tokenize.STRING:
+        try:
+            value = ast.literal_eval(tokens[index][1])
+        except (ValueError, SyntaxError):
+            return None
+        if type(value) is not str:
+            return None
+        parts.append(value)
+        index += 1
+
+    for _ in range(depth):
+        if index >= len(tokens) or tokens[index] != (tokenize.OP, ')'):
+            return None
+        index += 1
+
+    if not parts or index >= len(tokens) or tokens[index] not in ((tokenize.OP, ','), (tokenize.OP, ')')):
+        return None
+    return ''.join(parts)
+
+def extract_classes_from_source(source: bytes) -> Set[str]:
+    """
+    Extract class names from HTPy template source without building an AST.
+
+    Scans the token stream for string literals passed as a class_ keyword
+    argument, or as the first argument of a call to an HTPy tag name, which
+    is the same information extract_classes reads from the tree.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Set[str]: Set of Tailwind class names found
+
+    Raises:
+        tokenize.TokenError: If the source cannot be tokenized
+    """
+    tokens = [
+        (token.type, token.string)
+        for token in tokenize.tokenize(io.BytesIO(source).readline)
+        if token.type not in _IGNORED_TOKENS
+    ]
+    classes: Set[str] = set()
+    # For each open bracket, whether it holds call arguments
+    brackets: List[bool] = []
+
+    for index, (token_type, string) in enumerate(tokens):
+        if token_type == tokenize.OP:
+            if string in ('(', '[', '{'):
+                prev_type, prev_string = tokens[index - 1]
+                before = tokens[index - 2][1] if index >= 2 else ''
+                is_call = string == '(' and (
+                    (prev_type == tokenize.NAME and not keyword.iskeyword(prev_string)
+                     and before not in ('def', 'class')) or
+                    prev_string in (')', ']')
+                )
+                brackets.append(is_call)
+
+                # Check for dot notation (e.g., div(".class1 .class2"))
+                if is_call and prev_string in HTPY_TAGS and before != '.':
+                    value = _string_argument(tokens, index + 1)
+                    if value is not None and value.startswith('.'):
+                        classes.update(_DOT_CLASS_RE.findall(value))
+            elif string in (')', ']', '}'):
+                if brackets:
+                    brackets.pop()
+
+        # Check for class_ keyword arguments
+        elif (token_type == tokenize.NAME and string == 'class_' and brackets and brackets[-1]
+              and tokens[index - 1] in ((tokenize.OP, '('), (tokenize.OP, ','))
+              and index + 1 < len(tokens) and tokens[index + 1] == (tokenize.OP, '=')):
+            value = _string_argument(tokens, index + 2)
+            if value is not None:
+                classes.update(_CLASS_RE.findall(value))
+
+    return classes
@@ -6,148 +6,449 @@ containing the Tailwind classes used in the templates.
 """
 
 import ast
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from pathlib import Path
-from typing import Set, List, Optional
+from typing import BinaryIO, Dict, FrozenSet, Iterator, Set, List, Optional, Tuple
 from watchdog.events import FileSystemEventHandler
+try:
+    from ._visitor import TemplateVisitor, extract_classes, extract_classes_from_source
+except ImportError:  # Run as a script, or copied next to _visitor.py without the package
+    from _visitor import TemplateVisitor, extract_classes, extract_classes_from_source  # type: ignore[import-not-found, no-redef]
+import threading
 import time
 import fnmatch
+import hashlib
+import json
+import mmap
 import os
+import re
+import tempfile
+import tokenize
+
+try:
+    import xxhash  # type: ignore[import-not-found]
+except ImportError:  # Optional speedup, installed with the "fast" extra
+    xxhash = None  # type: ignore[assignment]
+
+# Bump whenever the extraction logic changes so stale cache entries are ignored
+CACHE_VERSION = b"7"
+MAX_CACHE_ENTRIES = 10_000
+# Results kept in memory per process, so repeated content skips the disk cache too
+MEMORY_CACHE_ENTRIES = 4096
+# Delay before regenerating in watch mode, so editors that emit bursts of events trigger one rescan
+DEBOUNCE_SECONDS = 0.1
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_THRESHOLD = 8
+# Every file with class names contains one of these; anything else is skipped without parsing
+SOURCE_MARKERS = (b"class_", b"'.", b'".')
+# Files larger than this are memory-mapped, so ones without markers are never copied into memory
+MMAP_THRESHOLD = 64 * 1024
+# Files modified more recently than this may change again within the same mtime tick,
+# so their stat signature is not trusted (the same "racy" window git uses)
+RACY_WINDOW_NS = 2_000_000_000
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory used to cache extracted classes between runs.
+
+    Honors TAILWIND_HTPY_SCANNER_CACHE_DIR, then XDG_CACHE_HOME, then ~/.cache.
+
+    Returns:
+        Path: The cache directory (not guaranteed to exist)
+    """
+    override = os.environ.get("TAILWIND_HTPY_SCANNER_CACHE_DIR")
+    if override:
+        return Path(override)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "tailwind_htpy_scanner"
+
+def _read_cache(cache_file: Path) -> Optional[Set[str]]:
+    """Load a cached class set, returning None on a miss or unreadable entry."""
+    try:
+        classes = set(json.loads(cache_file.read_bytes()))
+    except (OSError, ValueError, TypeError):
+        return None
+    try:
+        # Touch the entry so prune_cache evicts least recently used entries first
+        os.utime(cache_file)
+    except OSError:
+        pass
+    return classes
+
+def _write_cache(cache_file: Path, classes: Set[str]) -> None:
+    """Atomically write a class set to the cache, ignoring any I/O failure."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(sorted(classes), f)
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        pass
+
+def prune_cache(max_entries: int = MAX_CACHE_ENTRIES) -> None:
+    """
+    Evict the least recently used cache entries beyond max_entries.
 
-class TemplateVisitor(ast.NodeVisitor):
-    """AST visitor that extracts class names from HTPy template code."""
-    def __init__(self):
-        self.classes: Set[str] = set()
-
-    def visit_Call(self, node: ast.Call) -> None:
-        """Visit function calls, looking for class_ attributes and dot notation classes."""
-        # Check for class_ keyword arguments
-        if hasattr(node, 'keywords'):
-            for keyword in node.keywords:
-                if keyword.arg == 'class_' and isinstance(keyword.value, ast.Constant):
-                    classes = keyword.value.value.split()
-                    self.classes.update(classes)
-
-        # Check for dot notation (e.g., div(".class1 .class2"))
-        if (isinstance(node.func, ast.Name) and
-            node.args and
-            isinstance(node.args[0], ast.Constant) and
-            isinstance(node.args[0].value, str) and
-            node.args[0].value.startswith('.')):
-            # Remove leading dots and split on whitespace or dots
-            classes = [c.lstrip('.') for c in node.args[0].value.split()]
-            self.classes.update(classes)
-
-        self.generic_visit(node)
-
-def scan_file(file_path: Path) -> Set[str]:
+    Args:
+        max_entries: Number of entries to keep
+    """
+    try:
+        entries = [(entry.stat().st_mtime, entry) for entry in get_cache_dir().glob("*.json")]
+    except OSError:
+        return
+    if len(entries) <= max_entries:
+        return
+    entries.sort()
+    for _, entry in entries[:len(entries) - max_entries]:
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+
+_memory_cache: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+# Per-path results keyed by (st_mtime_ns, st_size), so unchanged files are not even read
+_stat_cache: Dict[Tuple[str, bool], Tuple[Tuple[int, int], FrozenSet[str]]] = {}
+
+def _remember(digest: str, classes: FrozenSet[str]) -> FrozenSet[str]:
+    """Store a result in the in-memory LRU cache, evicting the oldest entry when full."""
+    _memory_cache[digest] = classes
+    if len(_memory_cache) > MEMORY_CACHE_ENTRIES:
+        _memory_cache.popitem(last=False)
+    return classes
+
+def _source_digest(data: bytes, strict: bool) -> str:
+    """Hash source bytes for the cache key, using xxhash when it is installed."""
+    salt = CACHE_VERSION + (b"-strict" if strict else b"")
+    if xxhash is not None:
+        hasher = xxhash.xxh3_128(salt)
+        hasher.update(data)
+        return hasher.hexdigest()
+    return hashlib.blake2b(data, digest_size=16, salt=salt).hexdigest()
+
+def _classes_for_source(data: bytes, strict: bool) -> Tuple[str, FrozenSet[str]]:
+    """Extract classes from source bytes, consulting the memory and disk caches first."""
+    digest = _source_digest(data, strict)
+    classes = _memory_cache.get(digest)
+    if classes is not None:
+        _memory_cache.move_to_end(digest)
+        return digest, classes
+
+    cache_file = get_cache_dir() / f"{digest}.json"
+    cached = _read_cache(cache_file)
+    if cached is not None:
+        return digest, _remember(digest, frozenset(cached))
+
+    if strict:
+        extracted = extract_classes(ast.parse(data))
+    else:
+        extracted = extract_classes_from_source(data)
+    _write_cache(cache_file, extracted)
+    return digest, _remember(digest, frozenset(extracted))
+
+def _read_source(f: BinaryIO, size: int) -> Optional[bytes]:
+    """Read an open source file, returning None if it cannot contain any classes."""
+    if size <= MMAP_THRESHOLD:
+        data = f.read()
+        return data if any(marker in data for marker in SOURCE_MARKERS) else None
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if all(mm.find(marker) == -1 for marker in SOURCE_MARKERS):
+            return None
+        return mm[:]
+
+# What scanning one file produced: its classes, the stat signature to record
+# (None if the file is too recently modified to trust), and the content digest
+# (None if the file was never hashed)
+ScanResult = Tuple[FrozenSet[str], Optional[Tuple[int, int]], Optional[str]]
+
+def _scan_file_result(file_path: Path, strict: bool = False) -> ScanResult:
+    """Scan one file and report what the caches need, so worker processes can pass it back."""
+    try:
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            signature: Optional[Tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+            known = _stat_cache.get((os.fspath(file_path), strict))
+            if known is not None and known[0] == signature:
+                return known[1], None, None
+            data = _read_source(f, stat.st_size)
+
+        digest: Optional[str] = None
+        classes: FrozenSet[str] = frozenset()
+        if data is not None:
+            digest, classes = _classes_for_source(data, strict)
+        if time.time_ns() - stat.st_mtime_ns <= RACY_WINDOW_NS:
+            signature = None
+        return classes, signature, digest
+    except (SyntaxError, tokenize.TokenError):
+        print(f"Error parsing {file_path}")
+    except Exception as e:
+        print(f"Error scanning {file_path}: {e}")
+    return frozenset(), None, None
+
+def _record_result(file_path: Path, strict: bool, result: ScanResult) -> Set[str]:
+    """Seed this process's stat and memory caches from a scan result."""
+    classes, signature, digest = result
+    if signature is not None:
+        _stat_cache[(os.fspath(file_path), strict)] = (signature, classes)
+    if digest is not None and digest not in _memory_cache:
+        _remember(digest, classes)
+    return set(classes)
+
+def scan_file(file_path: Path, strict: bool = False) -> Set[str]:
     """
     Scan a single Python file for HTPy class definitions.
 
+    Results are cached in memory and on disk keyed by a hash of the file
+    contents, so unchanged files are not parsed again. Files whose mtime and
+    size have not changed since the last scan in this process are not read.
+
     Args:
         file_path: Path to the Python file to scan
+        strict: Parse the file into an AST instead of scanning its tokens
 
     Returns:
         Set[str]: Set of Tailwind class names found in the file
     """
-    try:
-        with open(file_path) as f:
-            tree = ast.parse(f.read())
-            visitor = TemplateVisitor()
-            visitor.visit(tree)
-            return visitor.classes
-    except SyntaxError:
-        print(f"Error parsing {file_path}")
-        return set()
-    except Exception as e:
-        print(f"Error scanning {file_path}: {e}")
-        return set()
+    return _record_result(file_path, strict, _scan_file_result(file_path, strict))
 
-def scan_directory(directory: Path, template_files: Optional[List[str]] = None) -> Set[str]:
+def iter_template_paths(directory: Path, template_files: Optional[List[str]] = None,
+                        matcher: Optional["GitignoreMatcher"] = None) -> Iterator[Path]:
     """
-    Scan directory for Python files containing HTPy templates.
+    Yield the Python files that should be scanned for HTPy templates.
 
     Args:
         directory: Base directory to scan
         template_files: Optional list of specific template files to scan
+        matcher: Compiled .gitignore patterns; read from directory when omitted
 
-    Returns:
-        Set[str]: Set of all unique Tailwind class names found
+    Yields:
+        Path: Each template file to scan
     """
-    all_classes = set()
-
     if template_files:
         # Scan only specific template files
         for file_name in template_files:
             file_path = directory / file_name
             if file_path.exists():
-                print(f"Scanning {file_path}")
-                classes = scan_file(file_path)
-                all_classes.update(classes)
+                yield file_path
     else:
-        # Scan all Python files in directory
-        for file_path in directory.rglob("*.py"):
-            if not any(part.startswith('.') for part in file_path.parts) and \
-               not should_ignore_path(file_path, directory):
-                print(f"Scanning {file_path}")
-                classes = scan_file(file_path)
-                all_classes.update(classes)
+        # Scan all Python files in directory, reading .gitignore once up front
+        if matcher is None:
+            matcher = GitignoreMatcher(load_gitignore(directory))
+        yield from map(Path, _walk_py(str(directory), "", matcher))
 
-    return all_classes
+def _walk_py(directory: str, relative_dir: str, matcher: "GitignoreMatcher") -> Iterator[str]:
+    """
+    Yield the non-hidden, non-ignored .py files under directory.
 
-def should_ignore_path(path: Path, base_dir: Path) -> bool:
+    Ignored and hidden directories are pruned without being listed, and
+    entries are classified from scandir's cached file type without a stat.
     """
-    Check if a path should be ignored based on .gitignore patterns.
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        name = entry.name
+        if name.startswith('.'):
+            continue
+        relative_path = f"{relative_dir}{name}"
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if not matcher.match_entry(relative_path):
+                    yield from _walk_py(entry.path, f"{relative_path}/", matcher)
+            elif name.endswith('.py') and entry.is_file() and not matcher.match_entry(relative_path):
+                yield entry.path
+        except OSError:
+            continue
+
+def _prefetch_files(file_paths: List[Path]) -> None:
+    """Ask the kernel to start reading files into the page cache before they are scanned."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+def scan_files(directory: Path, template_files: Optional[List[str]] = None,
+               strict: bool = False, matcher: Optional["GitignoreMatcher"] = None,
+               parallel: bool = False) -> Dict[Path, Set[str]]:
+    """
+    Scan directory for Python files containing HTPy templates, keeping results per file.
+
+    Args:
+        directory: Base directory to scan
+        template_files: Optional list of specific template files to scan
+        strict: Parse files into ASTs instead of scanning their tokens
+        matcher: Compiled .gitignore patterns; read from directory when omitted
+        parallel: Scan in worker processes when there are many files. Only pass
+            this from the main thread of a script with a __main__ guard
+
+    Returns:
+        Dict[Path, Set[str]]: Tailwind class names found in each scanned file
+    """
+    file_paths = list(iter_template_paths(directory, template_files, matcher))
+    for file_path in file_paths:
+        print(f"Scanning {file_path}")
+
+    if parallel and len(file_paths) > PARALLEL_THRESHOLD:
+        # On a cold page cache the reads dominate, so queue them all before the workers start
+        _prefetch_files(file_paths)
+        try:
+            with ProcessPoolExecutor() as executor:
+                results = executor.map(partial(_scan_file_result, strict=strict), file_paths, chunksize=16)
+                # Workers' caches die with them, so keep what they learned in this process
+                return {
+                    file_path: _record_result(file_path, strict, result)
+                    for file_path, result in zip(file_paths, results)
+                }
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Parallel scan failed ({e}), scanning serially")
+
+    return {file_path: scan_file(file_path, strict) for file_path in file_paths}
+
+def scan_directory(directory: Path, template_files: Optional[List[str]] = None,
+                   strict: bool = False, parallel: bool = False) -> Set[str]:
+    """
+    Scan directory for Python files containing HTPy templates.
+
+    Args:
+        directory: Base directory to scan
+        template_files: Optional list of specific template files to scan
+        strict: Parse files into ASTs instead of scanning their tokens
+        parallel: Scan in worker processes when there are many files (see scan_files)
+
+    Returns:
+        Set[str]: Set of all unique Tailwind class names found
+    """
+    return set().union(*scan_files(directory, template_files, strict, parallel=parallel).values())
+
+def load_gitignore(base_dir: Path) -> List[str]:
+    """
+    Read the patterns from the .gitignore file in base_dir.
 
     Args:
-        path: The path to check
         base_dir: The base directory containing the .gitignore file
 
     Returns:
-        bool: True if the path should be ignored, False otherwise
+        List[str]: The non-empty, non-comment patterns (empty if there is no .gitignore)
     """
     gitignore_path = base_dir / '.gitignore'
-    if not gitignore_path.exists():
-        return False
-
-    # Get relative path for matching
     try:
-        relative_path = str(path.relative_to(base_dir))
-    except ValueError:
-        return False
-
-    # Read and process gitignore patterns
-    patterns = [
+        lines = gitignore_path.read_text().splitlines()
+    except OSError:
+        return []
+    return [
         line.strip()
-        for line in gitignore_path.read_text().splitlines()
+        for line in lines
         if line.strip() and not line.startswith('#')
     ]
 
-    for pattern in patterns:
-        # Handle directory patterns
-        if pattern.endswith('/'):
-            if any(part == pattern[:-1] for part in path.parts):
-                return True
-            pattern_path = str(Path(pattern))
-            if relative_path.startswith(pattern_path):
-                return True
+class GitignoreMatcher:
+    """
+    .gitignore patterns compiled into regular expressions.
 
-        # Handle absolute paths (starting with /)
-        elif pattern.startswith('/'):
-            clean_pattern = pattern[1:]  # Remove leading slash
-            if relative_path == clean_pattern or relative_path.startswith(f"{clean_pattern}/"):
+    Each kind of pattern is joined into a single alternation, so matching a
+    path costs at most three regex calls however many patterns there are.
+    """
+    def __init__(self, patterns: List[str]):
+        dir_parts = []
+        abs_parts = []
+        glob_parts = []
+        for pattern in patterns:
+            # Handle directory patterns
+            if pattern.endswith('/'):
+                name = pattern[:-1]
+                if '/' in name:
+                    # Nested directories are anchored to the base directory
+                    abs_parts.append(re.escape(name.lstrip('/')))
+                else:
+                    dir_parts.append(re.escape(name))
+
+            # Handle absolute paths (starting with /)
+            elif pattern.startswith('/'):
+                abs_parts.append(re.escape(pattern[1:]))
+
+            # Handle file patterns, matched against the full path and all subdirectories
+            else:
+                glob_parts.append(fnmatch.translate(pattern))
+                glob_parts.append(fnmatch.translate(f"**/{pattern}"))
+
+        self.dir_re = self._compile(r"(?:^|/)(?:{})(?:/|$)", dir_parts)
+        self.abs_re = self._compile(r"(?:{})(?:/|$)", abs_parts)
+        self.glob_re = self._compile(r"(?:{})", glob_parts)
+
+    @staticmethod
+    def _compile(template: str, parts: List[str]) -> re.Pattern:
+        if not parts:
+            # Never matches, so match() needs no per-kind checks
+            return re.compile(r"(?!)")
+        return re.compile(template.format('|'.join(parts)))
+
+    def match(self, relative_path: str) -> bool:
+        """Check whether a path relative to the base directory is ignored."""
+        if self.match_entry(relative_path):
+            return True
+        # A glob matching an ancestor directory ignores everything beneath it,
+        # as the directory walker prunes that directory
+        end = relative_path.find('/')
+        while end != -1:
+            if self.glob_re.match(relative_path, 0, end):
                 return True
+            end = relative_path.find('/', end + 1)
+        return False
 
-        # Handle file patterns
-        else:
-            # Test the pattern against the full path and all subdirectories
-            if fnmatch.fnmatch(relative_path, pattern) or \
-               fnmatch.fnmatch(relative_path, f"**/{pattern}") or \
-               (pattern.endswith('/') and any(fnmatch.fnmatch(part, pattern[:-1]) for part in path.parts)):
-                return True
+    def match_entry(self, relative_path: str) -> bool:
+        """
+        Check a path whose ancestor directories are already known not to be ignored.
 
-    return False
+        Used by the directory walker, which never descends into ignored directories.
+        """
+        return bool(
+            self.dir_re.search(relative_path) or
+            self.abs_re.match(relative_path) or
+            self.glob_re.match(relative_path)
+        )
 
-def main(base_dir: Optional[Path] = None, template_files: Optional[List[str]] = None, watch: bool = False):
+def should_ignore_path(path: Path, base_dir: Path, matcher: Optional[GitignoreMatcher] = None) -> bool:
+    """
+    Check if a path should be ignored based on .gitignore patterns.
+
+    Args:
+        path: The path to check
+        base_dir: The base directory containing the .gitignore file
+        matcher: Compiled patterns; read from base_dir's .gitignore when omitted
+
+    Returns:
+        bool: True if the path should be ignored, False otherwise
+    """
+    if matcher is None:
+        matcher = GitignoreMatcher(load_gitignore(base_dir))
+
+    # Get relative path for matching
+    try:
+        relative_path = path.relative_to(base_dir).as_posix()
+    except ValueError:
+        return False
+
+    return matcher.match(relative_path)
+
+def main(base_dir: Optional[Path] = None, template_files: Optional[List[str]] = None, watch: bool = False,
+         strict: bool = False):
     """
     Main entry point for the scanner.
 
@@ -155,6 +456,7 @@ def main(base_dir: Optional[Path] = None, template_files: Optional[List[str]] =
         base_dir: Base directory to scan (defaults to parent of script directory)
         template_files: Optional list of specific template files to scan
         watch: Whether to watch for file changes
+        strict: Parse files into ASTs instead of scanning their tokens
     """
     if base_dir is None:
         base_dir = Path(__file__).parent.parent
@@ -163,19 +465,23 @@ def main(base_dir: Optional[Path] = None, template_files: Optional[List[str]] =
     output_dir.mkdir(parents=True, exist_ok=True)
     output_file = output_dir / "templates.js"
 
-    def scan_and_generate():
+    def scan_and_generate() -> Tuple[Dict[Path, Set[str]], int]:
         print(f"Scanning directory: {base_dir}")
         print(f"Template files: {template_files}")
-        classes = scan_directory(base_dir, template_files)
-        generate_template_js(classes, output_file)
+        file_classes = scan_files(base_dir, template_files, strict, parallel=True)
+        classes = set().union(*file_classes.values())
+        fingerprint = generate_template_js(classes, output_file)
         print(f"Generated {output_file} with {len(classes)} unique classes")
+        return file_classes, fingerprint
 
-    scan_and_generate()
+    prune_cache()
+    file_classes, fingerprint = scan_and_generate()
 
     if watch:
         from watchdog.observers import Observer
 
-        handler = TemplateHandler(base_dir, template_files, output_file)
+        handler = TemplateHandler(base_dir, template_files, output_file, file_classes, strict=strict,
+                                  output_fingerprint=fingerprint)
         observer = Observer()
         observer.schedule(handler, str(base_dir), recursive=True)
         observer.start()
@@ -189,36 +495,178 @@ def main(base_dir: Optional[Path] = None, template_files: Optional[List[str]] =
 
 
 class TemplateHandler(FileSystemEventHandler):
-    """Handler for template file changes."""
-    def __init__(self, base_dir: Path, template_files: Optional[List[str]], output_file: Path):
+    """
+    Handler for template file changes.
+
+    Keeps the classes found in each file so a change only rescans the files
+    that were touched. Events are debounced so bursts of writes regenerate
+    the output once.
+    """
+    def __init__(self, base_dir: Path, template_files: Optional[List[str]], output_file: Path,
+                 file_classes: Optional[Dict[Path, Set[str]]] = None, debounce: float = DEBOUNCE_SECONDS,
+                 strict: bool = False, output_fingerprint: Optional[int] = None):
         self.base_dir = base_dir
         self.template_files = template_files
         self.output_file = output_file
+        self.debounce = debounce
+        self.strict = strict
+        self._gitignore_path = self._normalize(base_dir / '.gitignore')
+        # Precomputed so is_template can slice relative paths without any Path arithmetic
+        self._base_prefix = os.path.join(os.path.abspath(base_dir), '')
+        self._template_paths = frozenset(self._normalize(base_dir / name) for name in template_files or ())
+        self._gitignore_cache: Optional[Tuple[Optional[Tuple[int, int]], GitignoreMatcher]] = None
+        if file_classes is None:
+            file_classes = scan_files(base_dir, template_files, strict, self.gitignore_matcher())
+        self.file_classes: Dict[Path, Set[str]] = {
+            self._normalize(path): classes for path, classes in file_classes.items()
+        }
+        self._pending: Set[Path] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        # Fingerprint of the classes last written to output_file, from generate_template_js
+        self._output_fingerprint = output_fingerprint
+
+    @staticmethod
+    def _normalize(path) -> Path:
+        return Path(os.path.abspath(path))
+
+    def gitignore_matcher(self) -> GitignoreMatcher:
+        """Get the compiled .gitignore patterns, recompiling only when the file has changed."""
+        try:
+            stat = os.stat(self._gitignore_path)
+            key: Optional[Tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        if self._gitignore_cache is None or self._gitignore_cache[0] != key:
+            self._gitignore_cache = (key, GitignoreMatcher(load_gitignore(self.base_dir)))
+        return self._gitignore_cache[1]
+
+    def is_template(self, path: Path) -> bool:
+        """Check whether a path is one of the files this handler scans."""
+        if self.template_files:
+            return path in self._template_paths
+        path_str = str(path)
+        if not path_str.endswith('.py') or not path_str.startswith(self._base_prefix):
+            return False
+        relative_path = path_str[len(self._base_prefix):].replace(os.sep, '/')
+        return '/.' not in f"/{relative_path}" and not self.gitignore_matcher().match(relative_path)
 
     def on_modified(self, event):
         """Handle file modification events."""
-        if event.src_path.endswith('.py'):
-            print(f"Detected change in {event.src_path}")
-            classes = scan_directory(self.base_dir, self.template_files)
-            generate_template_js(classes, self.output_file)
-
-def generate_template_js(classes: Set[str], output_path: Path) -> None:
+        if not event.is_directory:
+            self._schedule(event.src_path)
+
+    def on_created(self, event):
+        """Handle file and directory creation events."""
+        self._schedule(*self._event_paths(event.src_path, event.is_directory))
+
+    def on_deleted(self, event):
+        """Handle file and directory deletion events."""
+        self._schedule(*self._event_paths(event.src_path, event.is_directory))
+
+    def on_moved(self, event):
+        """Handle file and directory rename events."""
+        self._schedule(*self._event_paths(event.src_path, event.is_directory),
+                       *self._event_paths(event.dest_path, event.is_directory))
+
+    def _event_paths(self, src_path, is_directory: bool) -> List[Path]:
+        """
+        Get the files affected by an event on src_path.
+
+        For a directory this is every tracked file beneath it, which flush drops
+        if it is gone, plus every template file currently inside it. Hidden and
+        ignored directories are never listed.
+        """
+        path = self._normalize(src_path)
+        if not is_directory:
+            return [path]
+        prefix = os.path.join(path, '')
+        with self._lock:
+            paths = [tracked for tracked in self.file_classes if str(tracked).startswith(prefix)]
+        if self.template_files:
+            paths.extend(template for template in self._template_paths if str(template).startswith(prefix))
+            return paths
+
+        path_str = str(path)
+        if not path_str.startswith(self._base_prefix) or not path.is_dir():
+            return paths
+        relative_path = path_str[len(self._base_prefix):].replace(os.sep, '/')
+        matcher = self.gitignore_matcher()
+        if '/.' in f"/{relative_path}" or matcher.match(relative_path):
+            return paths
+        paths.extend(Path(file_path) for file_path in _walk_py(path_str, f"{relative_path}/", matcher))
+        return paths
+
+    def _schedule(self, *src_paths) -> None:
+        paths = {self._normalize(src_path) for src_path in src_paths}
+        paths = {
+            path for path in paths
+            if path in self.file_classes or path == self._gitignore_path or self.is_template(path)
+        }
+        if not paths:
+            return
+        for path in paths:
+            print(f"Detected change in {path}")
+        with self._lock:
+            self._pending.update(paths)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Rescan the changed files and regenerate the output."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, set()
+            if not pending:
+                return
+            if self._gitignore_path in pending and not self.template_files:
+                # Ignored files may have changed, so rescan everything with the new patterns
+                self.file_classes = {
+                    self._normalize(path): classes
+                    for path, classes in scan_files(self.base_dir, None, self.strict, self.gitignore_matcher()).items()
+                }
+                pending = set()
+            for path in pending:
+                if path.exists() and self.is_template(path):
+                    self.file_classes[path] = scan_file(path, self.strict)
+                else:
+                    self.file_classes.pop(path, None)
+            classes = set().union(*self.file_classes.values())
+            self._output_fingerprint = generate_template_js(classes, self.output_file, self._output_fingerprint)
+
+def generate_template_js(classes: Set[str], output_path: Path, previous: Optional[int] = None) -> int:
     """
     Generate a JavaScript file containing template classes for Tailwind.
 
     Args:
         classes: Set of class names to include
         output_path: Path where the JavaScript file should be written
+        previous: Fingerprint returned by an earlier call; the file is left
+            untouched when the classes have not changed since then
+
+    Returns:
+        int: Fingerprint of the classes, to pass as previous next time
     """
+    fingerprint = hash(frozenset(classes))
+    if fingerprint == previous and output_path.exists():
+        return fingerprint
+
+    sorted_classes = sorted(classes)
     js_content = f"""// Generated by template scanner - do not edit directly
 const templates = `
-{' '.join(sorted(classes))}
+{' '.join(sorted_classes)}
 `;
 
 export default templates;
 """
-    output_path.write_text(js_content)
-    print(f"Found classes: {', '.join(sorted(classes))}")
+    output_path.write_bytes(js_content.encode())
+    print(f"Found classes: {', '.join(sorted_classes)}")
+    return fingerprint
 
 if __name__ == "__main__":
     import argparse
@@ -227,7 +675,9 @@ if __name__ == "__main__":
     parser.add_argument('--dir', type=Path, help='Base directory to scan')
     parser.add_argument('--files', nargs='+', help='Specific template files to scan')
     parser.add_argument('--watch', action='store_true', help='Watch for file changes')
+    parser.add_argument('--strict', action='store_true',
+                        help='Parse files into ASTs instead of scanning tokens (slower, exact)')
 
     args = parser.parse_args()
 
-    main(args.dir, args.files, args.watch)
+    main(args.dir, args.files, args.watch, args.strict)
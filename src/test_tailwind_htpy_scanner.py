@@ -1,11 +1,36 @@
 from tailwind_htpy_scanner import (
-    TemplateVisitor, TemplateHandler, scan_file, scan_directory,
-    generate_template_js, main, should_ignore_path
+    TemplateVisitor, TemplateHandler, extract_classes, extract_classes_from_source, scan_file, scan_directory,
+    generate_template_js, main, should_ignore_path, get_cache_dir, prune_cache,
+    load_gitignore, GitignoreMatcher, iter_template_paths
 )
 from unittest.mock import Mock
-from watchdog.events import FileModifiedEvent
+from watchdog.events import (
+    FileModifiedEvent, FileDeletedEvent, FileMovedEvent, DirDeletedEvent, DirMovedEvent, DirCreatedEvent
+)
 import ast
+import importlib
+import os
 import pytest
+import subprocess
+import sys
+
+# The package re-exports main(), which shadows the submodule attribute, so
+# ``tailwind_htpy_scanner.main`` resolves to the function; fetch the module itself.
+scanner = importlib.import_module("tailwind_htpy_scanner.main")
+
+
+def must_not_call(reason):
+    """Return a stub that fails the test if it is ever called."""
+    return Mock(side_effect=AssertionError(reason))
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep the on-disk class cache out of the user's home directory."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("TAILWIND_HTPY_SCANNER_CACHE_DIR", str(cache_dir))
+    scanner._memory_cache.clear()
+    scanner._stat_cache.clear()
+    return cache_dir
 
 def test_template_visitor_class_keyword():
     """Test that the visitor finds classes in class_ keyword arguments."""
@@ -177,3 +202,449 @@ relative/path/
     assert should_ignore_path(tmp_path / "absolute" / "path" / "file.py", tmp_path)
     assert should_ignore_path(tmp_path / "relative" / "path" / "file.py", tmp_path)
     assert not should_ignore_path(tmp_path / "normal.py", tmp_path)
+
+def test_scan_file_uses_cache(tmp_path, isolated_cache, monkeypatch):
+    """Test that unchanged files are served from the cache without parsing."""
+    test_file = tmp_path / "template.py"
+    test_file.write_text("div('.bg-blue-500', class_='p-4')")
+    assert scan_file(test_file) == {"bg-blue-500", "p-4"}
+    assert len(list(isolated_cache.glob("*.json"))) == 1
+
+    monkeypatch.setattr(scanner, "extract_classes_from_source", must_not_call("source should not be parsed on a cache hit"))
+    assert scan_file(test_file) == {"bg-blue-500", "p-4"}
+
+def test_scan_file_cache_invalidated_on_change(tmp_path):
+    """Test that editing a file produces a fresh result."""
+    test_file = tmp_path / "template.py"
+    test_file.write_text("div('.bg-blue-500')")
+    assert scan_file(test_file) == {"bg-blue-500"}
+    test_file.write_text("div('.bg-red-500')")
+    assert scan_file(test_file) == {"bg-red-500"}
+
+def test_prune_cache(tmp_path, isolated_cache):
+    """Test that pruning keeps only the most recently used entries."""
+    for i in range(5):
+        entry = isolated_cache / f"{i}.json"
+        entry.write_text("[]")
+        os.utime(entry, (i, i))
+    assert get_cache_dir() == isolated_cache
+    prune_cache(max_entries=2)
+    assert sorted(p.name for p in isolated_cache.glob("*.json")) == ["3.json", "4.json"]
+
+def test_template_handler_rescans_only_changed_file(tmp_path, monkeypatch):
+    """Test that a modification rescans just the changed file."""
+    (tmp_path / "template1.py").write_text("div('.bg-blue-500')")
+    (tmp_path / "template2.py").write_text("span(class_='text-white')")
+    output_file = tmp_path / "templates.js"
+    handler = TemplateHandler(tmp_path, None, output_file)
+
+    scanned = []
+    original_scan_file = scanner.scan_file
+    monkeypatch.setattr(scanner, "scan_file", lambda path, *args: scanned.append(path) or original_scan_file(path, *args))
+
+    (tmp_path / "template1.py").write_text("div('.bg-red-500')")
+    handler.on_modified(FileModifiedEvent(str(tmp_path / "template1.py")))
+    handler.on_modified(FileModifiedEvent(str(tmp_path / "template1.py")))
+    handler.on_modified(FileModifiedEvent(str(tmp_path / "notes.txt")))
+    handler.flush()
+
+    assert scanned == [tmp_path / "template1.py"]
+    content = output_file.read_text()
+    assert "bg-red-500" in content
+    assert "text-white" in content
+    assert "bg-blue-500" not in content
+
+def test_template_handler_deleted_and_moved(tmp_path):
+    """Test that deleted and renamed files update the class set."""
+    (tmp_path / "template1.py").write_text("div('.bg-blue-500')")
+    (tmp_path / "template2.py").write_text("span(class_='text-white')")
+    output_file = tmp_path / "templates.js"
+    handler = TemplateHandler(tmp_path, None, output_file)
+
+    (tmp_path / "template1.py").unlink()
+    handler.on_deleted(FileDeletedEvent(str(tmp_path / "template1.py")))
+    handler.flush()
+    assert "bg-blue-500" not in output_file.read_text()
+
+    (tmp_path / "template2.py").rename(tmp_path / "template2.txt")
+    handler.on_moved(FileMovedEvent(str(tmp_path / "template2.py"), str(tmp_path / "template2.txt")))
+    handler.flush()
+    assert handler.file_classes == {}
+
+def test_scan_directory_reads_gitignore_once(tmp_path, monkeypatch):
+    """Test that .gitignore is parsed once per scan rather than once per file."""
+    (tmp_path / ".gitignore").write_text("ignored/\n# comment\n\n*.ignored.py")
+    for i in range(5):
+        (tmp_path / f"template{i}.py").write_text(f"div('.p-{i}')")
+    assert load_gitignore(tmp_path) == ["ignored/", "*.ignored.py"]
+
+    calls = []
+    original_load_gitignore = scanner.load_gitignore
+    monkeypatch.setattr(scanner, "load_gitignore", lambda base_dir: calls.append(base_dir) or original_load_gitignore(base_dir))
+
+    assert scan_directory(tmp_path) == {f"p-{i}" for i in range(5)}
+    assert calls == [tmp_path]
+
+def test_scan_directory_parallel(tmp_path, monkeypatch):
+    """Test that scanning many files in worker processes gives the same result."""
+    for i in range(20):
+        (tmp_path / f"template{i}.py").write_text(f"div('.p-{i}', span(class_='m-{i}'))")
+    advised = []
+    if hasattr(os, "posix_fadvise"):
+        original_fadvise = os.posix_fadvise
+        monkeypatch.setattr(os, "posix_fadvise", lambda *args: advised.append(args) or original_fadvise(*args))
+
+    expected = {f"p-{i}" for i in range(20)} | {f"m-{i}" for i in range(20)}
+    assert scan_directory(tmp_path, parallel=True) == expected
+    if hasattr(os, "posix_fadvise"):
+        assert len(advised) == 20
+
+def test_scan_directory_parallel_falls_back_to_serial(tmp_path, monkeypatch):
+    """Test that a pool that cannot start degrades to a serial scan."""
+    from concurrent.futures.process import BrokenProcessPool
+    for i in range(20):
+        (tmp_path / f"template{i}.py").write_text(f"div('.p-{i}')")
+
+    monkeypatch.setattr(scanner, "ProcessPoolExecutor", Mock(side_effect=BrokenProcessPool("spawn failed")))
+    assert scan_directory(tmp_path, parallel=True) == {f"p-{i}" for i in range(20)}
+
+    # Parallelism is opt-in, so the default never touches the pool
+    monkeypatch.setattr(scanner, "ProcessPoolExecutor", must_not_call("pool used"))
+    assert scan_directory(tmp_path) == {f"p-{i}" for i in range(20)}
+
+def test_scan_file_skips_files_without_markers(tmp_path, monkeypatch):
+    """Test that files which cannot contain classes are never parsed."""
+    test_file = tmp_path / "helpers.py"
+    test_file.write_text("def add(a, b):\n    return a + b\n")
+
+    fail_parse = must_not_call("source should not be parsed")
+    monkeypatch.setattr(scanner, "extract_classes_from_source", fail_parse)
+    monkeypatch.setattr(scanner, "extract_classes", fail_parse)
+    assert scan_file(test_file) == set()
+
+def test_scan_file_multiline_call(tmp_path):
+    """Test that the pre-filter keeps dot notation split across lines."""
+    test_file = tmp_path / "template.py"
+    test_file.write_text('div(\n    ".flex .gap-2",\n)')
+    assert scan_file(test_file) == {"flex", "gap-2"}
+
+def test_gitignore_matcher():
+    """Test the compiled gitignore patterns against relative paths."""
+    matcher = GitignoreMatcher(["build/", "/absolute/path", "relative/path/", "*.ignored", "gen_*.py"])
+    assert matcher.match("build/any.py")
+    assert matcher.match("src/build/any.py")
+    assert not matcher.match("buildings/any.py")
+    assert matcher.match("absolute/path/file.py")
+    assert matcher.match("absolute/path")
+    assert not matcher.match("src/absolute/path/file.py")
+    assert matcher.match("relative/path/file.py")
+    assert matcher.match("test.ignored")
+    assert matcher.match("deep/dir/test.ignored")
+    assert matcher.match("gen_models.py")
+    assert matcher.match("pkg/gen_models.py")
+    assert not matcher.match("normal.py")
+    assert not GitignoreMatcher([]).match("anything.py")
+
+def test_extract_classes_ignores_non_string_constants():
+    """Test that non-string constants and attribute calls are skipped."""
+    tree = ast.parse("div(class_=None)\nhtpy.div('.nope')\ndiv(1)\ndiv('.flex', class_='p-2')")
+    assert extract_classes(tree) == {"flex", "p-2"}
+
+@pytest.mark.parametrize("code", [
+    "div(class_='bg-blue-500 text-white')",
+    "div('.bg-red-500 .p-4')",
+    "div('.flex .items-center', span(class_='text-sm font-bold'), p('.mx-4'))",
+    "div(\n    # comment\n    '.gap-2 .grid',\n    class_='a' 'b',\n)",
+    "h.div(class_='attr-call')\nh.div('.not-a-name')",
+    "def f(class_='not-a-call'):\n    return div('.x' + y)",
+    "div(f'.formatted', class_=f'{x}')\ndiv(b'.bytes')\nif ('.keyword'):\n    pass",
+    "div('.one', '.two')[0](class_='chained')\nlist(['.nested'])",
+    "div(class_=None)\ndiv(1)\ndiv()",
+    "print('.not-a-tag')\nsorted('.also-not')\nsection('.tag')",
+    "div(class_=(\n    'flex items-center '\n    'border px-4'\n))",
+    "div(('.x'))\ndiv(((('.deep' '.er'))), class_=('a'))",
+    "div(('.tuple', '.x'))\ndiv(('.x') + y)\ndiv(class_=('a', 'b'))\ndiv(class_=('a'))[0]",
+    "div('.flex.items-center  ..w-1/2 . .gap-4', class_='  gap-x-1.5\\n\\tflex ')",
+    "div('.a.b')",
+])
+def test_extract_classes_from_source_matches_ast(code):
+    """Test that the token scanner finds the same classes as the AST walk."""
+    assert extract_classes_from_source(code.encode()) == extract_classes(ast.parse(code))
+
+def test_scan_file_strict(tmp_path):
+    """Test that strict mode parses the file and reports syntax errors."""
+    test_file = tmp_path / "template.py"
+    test_file.write_text("div('.flex', span(class_='p-4'))")
+    assert scan_file(test_file, strict=True) == {"flex", "p-4"}
+
+    test_file.write_text("div('.flex' class_='p-4'")
+    assert scan_file(test_file, strict=True) == set()
+
+def test_template_handler_caches_gitignore(tmp_path):
+    """Test that the handler recompiles .gitignore only after it changes."""
+    (tmp_path / ".gitignore").write_text("ignored/")
+    (tmp_path / "template.py").write_text("div('.bg-blue-500')")
+    (tmp_path / "generated.py").write_text("div('.bg-red-500')")
+    output_file = tmp_path / "templates.js"
+    handler = TemplateHandler(tmp_path, None, output_file)
+
+    matcher = handler.gitignore_matcher()
+    assert handler.gitignore_matcher() is matcher
+    assert handler.is_template(tmp_path / "template.py")
+
+    (tmp_path / ".gitignore").write_text("ignored/\ngenerated.py")
+    handler.on_modified(FileModifiedEvent(str(tmp_path / ".gitignore")))
+    handler.flush()
+    assert handler.gitignore_matcher() is not matcher
+    assert not handler.is_template(tmp_path / "generated.py")
+    assert "bg-red-500" not in output_file.read_text()
+    assert "bg-blue-500" in output_file.read_text()
+
+def test_scan_directory_prunes_ignored_directories(tmp_path, monkeypatch):
+    """Test that ignored and hidden directories are never listed."""
+    (tmp_path / ".gitignore").write_text("node_modules/")
+    for name in ("node_modules", ".venv", "src"):
+        (tmp_path / name / "nested").mkdir(parents=True)
+        (tmp_path / name / "nested" / "template.py").write_text(f"div('.from-{name.strip('.')}')")
+
+    listed = []
+    original_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: listed.append(os.path.basename(path)) or original_scandir(path))
+
+    assert scan_directory(tmp_path) == {"from-src"}
+    assert "node_modules" not in listed
+    assert ".venv" not in listed
+    assert "nested" in listed
+
+def test_scan_file_memory_cache(tmp_path, isolated_cache, monkeypatch):
+    """Test that identical content is served from memory without touching the disk cache."""
+    (tmp_path / "a.py").write_text("div('.shared .p-4')")
+    (tmp_path / "b.py").write_text("div('.shared .p-4')")
+    assert scan_file(tmp_path / "a.py") == {"shared", "p-4"}
+
+    for entry in isolated_cache.glob("*.json"):
+        entry.unlink()
+    result = scan_file(tmp_path / "b.py")
+    assert result == {"shared", "p-4"}
+    assert list(isolated_cache.glob("*.json")) == []
+
+    # Callers get their own mutable copy
+    result.add("mutated")
+    assert scan_file(tmp_path / "a.py") == {"shared", "p-4"}
+
+def test_generate_template_js_skips_unchanged(tmp_path, capsys):
+    """Test that regenerating identical classes leaves the file alone."""
+    output_file = tmp_path / "templates.js"
+    fingerprint = generate_template_js({"p-4", "flex"}, output_file)
+    assert "flex p-4" in output_file.read_text()
+    capsys.readouterr()
+
+    output_file.write_text("sentinel")
+    assert generate_template_js({"flex", "p-4"}, output_file, fingerprint) == fingerprint
+    assert output_file.read_text() == "sentinel"
+    assert capsys.readouterr().out == ""
+
+    new_fingerprint = generate_template_js({"flex", "p-8"}, output_file, fingerprint)
+    assert new_fingerprint != fingerprint
+    assert "flex p-8" in output_file.read_text()
+
+def test_dot_notation_only_for_htpy_tags():
+    """Test that dot notation is only read from calls to HTML element names."""
+    tree = ast.parse("os.path.join('.git', 'x')\nprint('.not-a-class')\nsection('.py-8', card(class_='rounded'))")
+    assert extract_classes(tree) == {"py-8", "rounded"}
+
+def test_class_tokens_split_like_htpy():
+    """Test that dot notation splits on every dot while class_ values split on whitespace only."""
+    code = "div('.flex.items-center ..w-1/2 .', class_='gap-x-1.5  p-0.5')\nspan('.a.b')"
+    expected = {"flex", "items-center", "w-1/2", "gap-x-1.5", "p-0.5", "a", "b"}
+    assert extract_classes(ast.parse(code)) == expected
+    assert extract_classes_from_source(code.encode()) == expected
+
+def test_scan_file_large_files(tmp_path):
+    """Test that memory-mapped large files are filtered and scanned like small ones."""
+    padding = "x = 1\n" * 20_000
+    plain = tmp_path / "plain.py"
+    plain.write_text(padding)
+    assert scan_file(plain) == set()
+
+    template = tmp_path / "template.py"
+    template.write_text(padding + "div('.flex', class_='p-4')\n")
+    assert scan_file(template) == {"flex", "p-4"}
+    assert scan_file(template, strict=True) == {"flex", "p-4"}
+
+def test_scan_file_skips_reading_unchanged_files(tmp_path, monkeypatch):
+    """Test that a file with an old, unchanged mtime and size is not read again."""
+    test_file = tmp_path / "template.py"
+    test_file.write_text("div('.flex')")
+    os.utime(test_file, (1_000_000, 1_000_000))
+    assert scan_file(test_file) == {"flex"}
+
+    original_read_source = scanner._read_source
+    monkeypatch.setattr(scanner, "_read_source", must_not_call("should not be read"))
+    assert scan_file(test_file) == {"flex"}
+
+    # A change in size invalidates the entry even with the same mtime
+    test_file.write_text("div('.grid .gap-4')")
+    os.utime(test_file, (1_000_000, 1_000_000))
+    monkeypatch.setattr(scanner, "_read_source", original_read_source)
+    assert scan_file(test_file) == {"grid", "gap-4"}
+
+def test_scan_file_recent_files_always_read(tmp_path):
+    """Test that recently modified files are re-read, since their mtime may not have ticked."""
+    test_file = tmp_path / "template.py"
+    test_file.write_text("div('.bg-blue-500')")
+    assert scan_file(test_file) == {"bg-blue-500"}
+
+    # Same size and mtime, different content
+    stat = test_file.stat()
+    test_file.write_text("div('.bg-pink-500')")
+    os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert scan_file(test_file) == {"bg-pink-500"}
+
+@pytest.mark.parametrize("use_xxhash", [True, False])
+def test_source_digest(monkeypatch, use_xxhash):
+    """Test that cache keys depend on content and mode with either hash function."""
+    if not use_xxhash:
+        monkeypatch.setattr(scanner, "xxhash", None)
+    elif scanner.xxhash is None:
+        pytest.skip("xxhash is not installed")
+    digest = scanner._source_digest(b"div('.flex')", False)
+    assert digest == scanner._source_digest(b"div('.flex')", False)
+    assert digest != scanner._source_digest(b"div('.grid')", False)
+    assert digest != scanner._source_digest(b"div('.flex')", True)
+
+def test_template_handler_is_template(tmp_path):
+    """Test which event paths the handler treats as templates."""
+    (tmp_path / ".gitignore").write_text("build/\n*.gen.py")
+    handler = TemplateHandler(tmp_path, None, tmp_path / "templates.js", file_classes={})
+    assert handler.is_template(tmp_path / "template.py")
+    assert handler.is_template(tmp_path / "pkg" / "views.py")
+    assert not handler.is_template(tmp_path / "notes.txt")
+    assert not handler.is_template(tmp_path / ".venv" / "lib.py")
+    assert not handler.is_template(tmp_path / "pkg" / ".hidden.py")
+    assert not handler.is_template(tmp_path / "build" / "out.py")
+    assert not handler.is_template(tmp_path / "models.gen.py")
+    assert not handler.is_template(tmp_path.parent / "elsewhere.py")
+
+    handler = TemplateHandler(tmp_path, ["template.py"], tmp_path / "templates.js", file_classes={})
+    assert handler.is_template(tmp_path / "template.py")
+    assert not handler.is_template(tmp_path / "other.py")
+
+def test_ignore_checks_agree_with_directory_walk(tmp_path):
+    """Test that single-path ignore checks agree with what the directory walk prunes."""
+    (tmp_path / ".gitignore").write_text("venv\nbuild*\n/dist/\ncache/\n*.gen.py")
+    files = [
+        "venv/lib/x.py", "build_out/y.py", "src/build/z.py", "dist/a.py", "src/cache/b.py",
+        "src/models.gen.py", "src/app.py", "app.py", "src/venvironment/c.py",
+    ]
+    for name in files:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("div('.x')")
+
+    scanned = {path.relative_to(tmp_path).as_posix() for path in iter_template_paths(tmp_path)}
+    assert scanned == {"src/app.py", "app.py", "src/venvironment/c.py"}
+
+    handler = TemplateHandler(tmp_path, None, tmp_path / "templates.js", file_classes={})
+    for name in files:
+        assert should_ignore_path(tmp_path / name, tmp_path) == (name not in scanned), name
+        assert handler.is_template(tmp_path / name) == (name in scanned), name
+
+def test_template_handler_ignores_events_in_ignored_directories(tmp_path):
+    """Test that a change under a glob-ignored directory does not add its classes."""
+    (tmp_path / ".gitignore").write_text("venv")
+    (tmp_path / "venv" / "lib").mkdir(parents=True)
+    (tmp_path / "venv" / "lib" / "x.py").write_text("div('.from-venv')")
+    (tmp_path / "app.py").write_text("div('.from-app')")
+    output_file = tmp_path / "templates.js"
+    handler = TemplateHandler(tmp_path, None, output_file)
+    assert set(handler.file_classes) == {tmp_path / "app.py"}
+
+    handler.on_modified(FileModifiedEvent(str(tmp_path / "venv" / "lib" / "x.py")))
+    handler.on_modified(FileModifiedEvent(str(tmp_path / "app.py")))
+    handler.flush()
+    assert "from-venv" not in output_file.read_text()
+
+def test_template_handler_directory_events(tmp_path):
+    """Test that deleting or moving a directory updates the classes of the files inside it."""
+    (tmp_path / "old" / "nested").mkdir(parents=True)
+    (tmp_path / "old" / "nested" / "a.py").write_text("div('.gone')")
+    (tmp_path / "moved").mkdir()
+    (tmp_path / "moved" / "c.py").write_text("div('.renamed')")
+    (tmp_path / "b.py").write_text("div('.kept')")
+    output_file = tmp_path / "templates.js"
+    handler = TemplateHandler(tmp_path, None, output_file)
+
+    outside = tmp_path.parent / f"{tmp_path.name}-outside"
+    (tmp_path / "old").rename(outside)
+    handler.on_deleted(DirDeletedEvent(str(tmp_path / "old")))
+    (tmp_path / "b.py").write_text("div('.kept .edited')")
+    handler.on_modified(FileModifiedEvent(str(tmp_path / "b.py")))
+    handler.flush()
+    content = output_file.read_text()
+    assert "gone" not in content
+    assert "edited" in content
+
+    (tmp_path / "moved").rename(tmp_path / "renamed")
+    handler.on_moved(DirMovedEvent(str(tmp_path / "moved"), str(tmp_path / "renamed")))
+    handler.flush()
+    assert set(handler.file_classes) == {tmp_path / "b.py", tmp_path / "renamed" / "c.py"}
+
+    outside.rename(tmp_path / "back")
+    handler.on_created(DirCreatedEvent(str(tmp_path / "back")))
+    handler.flush()
+    assert "gone" in output_file.read_text()
+
+def test_main_runs_as_script():
+    """Test that main.py still runs directly, outside the package."""
+    result = subprocess.run([sys.executable, scanner.__file__, "--help"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert "--strict" in result.stdout
+
+def test_parallel_scan_seeds_parent_caches(tmp_path, monkeypatch):
+    """Test that results from worker processes let later scans in this process skip reading."""
+    for i in range(20):
+        path = tmp_path / f"template{i}.py"
+        path.write_text(f"div('.p-{i}')")
+        os.utime(path, (1_000_000, 1_000_000))
+    assert scan_directory(tmp_path, parallel=True) == {f"p-{i}" for i in range(20)}
+
+    assert len(scanner._memory_cache) == 20
+    monkeypatch.setattr(scanner, "_read_source", must_not_call("should not be read"))
+    assert scan_directory(tmp_path) == {f"p-{i}" for i in range(20)}
+
+def test_watch_mode_first_event_skips_unchanged_output(tmp_path, monkeypatch):
+    """Test that the handler starts from the initial scan's output, so a no-op save does not rewrite it."""
+    mock_observer = Mock()
+    monkeypatch.setattr("watchdog.observers.Observer", Mock(return_value=mock_observer))
+    monkeypatch.setattr("time.sleep", Mock(side_effect=KeyboardInterrupt))
+    test_file = tmp_path / "template.py"
+    test_file.write_text("div('.test-class')")
+
+    main(base_dir=tmp_path, watch=True)
+    handler = mock_observer.schedule.call_args[0][0]
+    output_file = tmp_path / "frontend" / "src" / "templates.js"
+    output_file.write_text("sentinel")
+
+    test_file.write_text("div('.test-class')  # reformatted")
+    handler.on_modified(FileModifiedEvent(str(test_file)))
+    handler.flush()
+    assert output_file.read_text() == "sentinel"
+
+def test_template_handler_skips_listing_ignored_directories(tmp_path, monkeypatch):
+    """Test that directory events under hidden or ignored directories never list their contents."""
+    (tmp_path / ".gitignore").write_text("node_modules/")
+    for name in (".venv/lib", "node_modules/pkg", "src/pkg"):
+        (tmp_path / name).mkdir(parents=True)
+        (tmp_path / name / "mod.py").write_text("div('.x')")
+    handler = TemplateHandler(tmp_path, None, tmp_path / "templates.js", file_classes={})
+
+    listed = []
+    original_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: listed.append(path) or original_scandir(path))
+
+    assert handler._event_paths(str(tmp_path / ".venv"), True) == []
+    assert handler._event_paths(str(tmp_path / ".venv" / "lib"), True) == []
+    assert handler._event_paths(str(tmp_path / "node_modules" / "pkg"), True) == []
+    assert listed == []
+
+    assert handler._event_paths(str(tmp_path / "src"), True) == [tmp_path / "src" / "pkg" / "mod.py"]